@@ -1,49 +1,101 @@
+import time
 from datetime import datetime, timezone
-from fastapi import APIRouter
+from functools import lru_cache
+from typing import Any
 
+import orjson
+from fastapi import APIRouter, Request, Response
+
+from app.core.cache import TTLCache
 from app.core.state import EngineState
 from app.engine.controller import EngineController
 from app.infra.repository import recent_events, recent_orders
 
+# The dashboard polls every few seconds; recent logs are re-read at most once per TTL.
+CACHE_TTL_SEC = 1.0
+CACHE_HEADERS = {"Cache-Control": f"max-age={CACHE_TTL_SEC:g}"}
+
+
+@lru_cache(maxsize=1)
+def _iso_second(second: int) -> str:
+    return datetime.fromtimestamp(second, timezone.utc).isoformat()
+
+
+def _now_iso() -> str:
+    # Envelope ts has 1s resolution, so every response within the same second shares one string.
+    return _iso_second(int(time.time()))
+
+
+def _encode(data: Any, ok: bool = True, error: str | None = None) -> bytes:
+    return orjson.dumps({"ok": ok, "data": data, "error": error, "ts": _now_iso()})
+
+
+def _json(body: bytes, headers: dict[str, str] | None = None) -> Response:
+    # Bodies are already orjson-encoded, so skip FastAPI's jsonable_encoder pass.
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison against an If-None-Match list, as RFC 9110 requires for that header."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def _conditional(request: Request, etag: str, body: bytes) -> Response:
+    headers = {"ETag": etag, **CACHE_HEADERS}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return _json(body, headers)
+
 
 def build_router(state: EngineState, controller: EngineController) -> APIRouter:
     router = APIRouter(prefix="/api")
+    cache = TTLCache(ttl_sec=CACHE_TTL_SEC)
+
+    def control_response(ok: bool, msg: str) -> Response:
+        return _json(_encode({"status": state.snapshot.status, "message": msg}, ok=ok, error=None if ok else msg))
 
     @router.post("/engine/start")
-    def start_engine():
-        ok, msg = controller.start()
-        return {"ok": ok, "data": {"status": state.status, "message": msg}, "error": None if ok else msg, "ts": datetime.now(timezone.utc)}
+    async def start_engine():
+        return control_response(*controller.start())
 
     @router.post("/engine/stop")
-    def stop_engine():
+    async def stop_engine():
         ok, msg = controller.stop()
-        return {"ok": ok, "data": {"status": state.status, "message": msg}, "error": None if ok else msg, "ts": datetime.now(timezone.utc)}
+        response = control_response(ok, msg)
+        if ok:
+            # Answer right away with STOPPING; the dashboard polls status for the IDLE transition.
+            response.status_code = 202
+        return response
 
     @router.post("/engine/reset")
-    def reset_engine():
-        ok, msg = controller.reset()
-        return {"ok": ok, "data": {"status": state.status, "message": msg}, "error": None if ok else msg, "ts": datetime.now(timezone.utc)}
+    async def reset_engine():
+        return control_response(*controller.reset())
 
     @router.get("/engine/status")
-    def engine_status():
-        return {
-            "ok": True,
-            "data": {
-                "status": state.status,
-                "last_error": state.last_error,
-                "started_at": state.started_at,
-                "cycle_count": state.cycle_count,
-            },
-            "error": None,
-            "ts": datetime.now(timezone.utc),
-        }
+    async def engine_status(request: Request):
+        # The engine re-encodes the snapshot whenever it changes, so this only splices bytes.
+        body = b'{"ok":true,"data":%b,"error":null,"ts":"%b"}' % (state.snapshot_json, _now_iso().encode())
+        return _conditional(request, state.snapshot_etag, body)
 
     @router.get("/orders/recent")
-    def orders():
-        return {"ok": True, "data": {"orders": recent_orders()}, "error": None, "ts": datetime.now(timezone.utc)}
+    async def orders(request: Request):
+        rows = await recent_orders(request.app.state.db)
+        return _json(_encode({"orders": rows}))
 
     @router.get("/logs/recent")
-    def logs():
-        return {"ok": True, "data": {"logs": recent_events()}, "error": None, "ts": datetime.now(timezone.utc)}
+    async def logs(request: Request):
+        cached = cache.get(request.url.path)
+        if cached is None:
+            version, rows = recent_events()
+            cached = (f'W/"{version}"', _encode({"logs": rows}))
+            cache.set(request.url.path, cached)
+        return _conditional(request, *cached)
 
     return router
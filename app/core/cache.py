@@ -0,0 +1,23 @@
+import time
+from typing import Any
+
+
+class TTLCache:
+    """Tiny in-process cache for hot GET payloads; entries expire after ``ttl_sec``."""
+
+    def __init__(self, ttl_sec: float):
+        self.ttl_sec = ttl_sec
+        self._entries: dict[str, tuple[float, Any]] = {}
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_sec, value)
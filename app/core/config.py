@@ -1,8 +1,12 @@
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field
 import os
 
 
 class Settings(BaseModel):
+    # load_settings() hands out one shared instance, so it must not be mutated.
+    model_config = ConfigDict(frozen=True)
+
     upbit_access_key: str = Field(default="")
     upbit_secret_key: str = Field(default="")
     app_host: str = Field(default="0.0.0.0")
@@ -19,7 +23,9 @@ def _as_bool(value: str | None, default: bool) -> bool:
     return value.lower() in {"1", "true", "yes", "on"}
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
+    """Parse the environment once; later calls (and ``Depends(load_settings)``) reuse it."""
     return Settings(
         upbit_access_key=os.getenv("UPBIT_ACCESS_KEY", ""),
         upbit_secret_key=os.getenv("UPBIT_SECRET_KEY", ""),
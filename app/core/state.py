@@ -1,8 +1,10 @@
+import asyncio
 from dataclasses import dataclass, field
 from enum import Enum
-from threading import Event, Lock
 from datetime import datetime
 
+import orjson
+
 
 class EngineStatus(str, Enum):
     IDLE = "IDLE"
@@ -11,11 +13,40 @@ class EngineStatus(str, Enum):
     ERROR = "ERROR"
 
 
-@dataclass
-class EngineState:
+@dataclass(frozen=True, slots=True)
+class EngineSnapshot:
     status: EngineStatus = EngineStatus.IDLE
     last_error: str | None = None
     started_at: datetime | None = None
     cycle_count: int = 0
-    lock: Lock = field(default_factory=Lock)
-    stop_event: Event = field(default_factory=Event)
+
+
+@dataclass
+class EngineState:
+    stop_event: asyncio.Event = field(default_factory=asyncio.Event)
+    # Written only by publish(); the engine and the API share one event loop, so readers
+    # always see a complete snapshot (and its matching encoding) without any lock.
+    _snapshot: EngineSnapshot = field(init=False, repr=False)
+    _snapshot_json: bytes = field(init=False, repr=False)
+    _snapshot_etag: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.publish(EngineSnapshot())
+
+    @property
+    def snapshot(self) -> EngineSnapshot:
+        return self._snapshot
+
+    @property
+    def snapshot_json(self) -> bytes:
+        """The snapshot pre-encoded once per publish(), so GET /api/engine/status never serializes."""
+        return self._snapshot_json
+
+    @property
+    def snapshot_etag(self) -> str:
+        return self._snapshot_etag
+
+    def publish(self, snapshot: EngineSnapshot) -> None:
+        self._snapshot_json = orjson.dumps(snapshot)
+        self._snapshot_etag = f'W/"{hash(snapshot) & 0xFFFFFFFFFFFFFFFF:x}"'
+        self._snapshot = snapshot
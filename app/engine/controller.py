@@ -1,59 +1,88 @@
-from threading import Thread
+from dataclasses import replace
 from datetime import datetime, timezone
-import time
+import asyncio
 
 from app.core.state import EngineState, EngineStatus
 from app.core.config import Settings
-from app.engine.strategy import generate_signal
-from app.infra.repository import log_event, insert_order
+from app.engine.strategy import PriceHistory, generate_signal
+from app.infra.repository import flush_writes, log_event, insert_order, take_write_error, utc_now_iso
 from app.infra.upbit_client import UpbitClient
 
 
 class EngineController:
+    """Runs the trading loop as a task on the server's event loop.
+
+    start/stop/reset must be called from that loop (the async API handlers do).
+    """
+
     def __init__(self, state: EngineState, settings: Settings):
         self.state = state
         self.settings = settings
         self.client = UpbitClient()
-        self._thread: Thread | None = None
+        self.prices = PriceHistory()
+        self._task: asyncio.Task | None = None
 
     def start(self) -> tuple[bool, str]:
-        with self.state.lock:
-            if self.state.status in {EngineStatus.RUNNING, EngineStatus.STOPPING}:
-                return False, "engine already running"
-            self.state.stop_event.clear()
-            self.state.status = EngineStatus.RUNNING
-            self.state.started_at = datetime.now(timezone.utc)
-            self.state.last_error = None
-            self._thread = Thread(target=self._run_loop, daemon=True)
-            self._thread.start()
-            log_event("INFO", "engine started")
+        if self.state.snapshot.status in {EngineStatus.RUNNING, EngineStatus.STOPPING}:
+            return False, "engine already running"
+        # A flush that failed while idle (or after the last run) belongs to that run, not this one.
+        stale_error = take_write_error()
+        if stale_error is not None:
+            log_event("WARNING", f"database write failed before this run: {stale_error}")
+        # Each run starts its price window from scratch rather than mixing in older ticks.
+        self.prices.clear()
+        # Fresh event per run so it is bound to the loop the task runs on.
+        self.state.stop_event = asyncio.Event()
+        self.state.publish(
+            replace(
+                self.state.snapshot,
+                status=EngineStatus.RUNNING,
+                started_at=datetime.now(timezone.utc),
+                last_error=None,
+            )
+        )
+        self._task = asyncio.create_task(self._run_loop())
+        log_event("INFO", "engine started")
         return True, "started"
 
     def stop(self) -> tuple[bool, str]:
-        with self.state.lock:
-            if self.state.status == EngineStatus.IDLE:
-                return False, "engine already idle"
-            if self.state.status == EngineStatus.ERROR:
-                return False, "engine in error; reset needed"
-            self.state.status = EngineStatus.STOPPING
-            self.state.stop_event.set()
-            log_event("INFO", "stop requested")
+        if self.state.snapshot.status == EngineStatus.IDLE:
+            return False, "engine already idle"
+        if self.state.snapshot.status == EngineStatus.ERROR:
+            return False, "engine in error; reset needed"
+        self.state.publish(replace(self.state.snapshot, status=EngineStatus.STOPPING))
+        self.state.stop_event.set()
+        log_event("INFO", "stop requested")
         return True, "stopping"
 
+    async def wait_stopped(self) -> None:
+        """Wait for the loop task to finish after stop(), cancelling it if it overruns."""
+        task = self._task
+        if task is None or task.done():
+            return
+        await asyncio.wait({task}, timeout=max(1.0, self.settings.loop_interval_sec * 3))
+        if not task.done():
+            task.cancel()
+            await asyncio.wait({task})
+
     def reset(self) -> tuple[bool, str]:
-        with self.state.lock:
-            if self.state.status != EngineStatus.ERROR:
-                return False, "reset only allowed in ERROR"
-            self.state.status = EngineStatus.IDLE
-            self.state.last_error = None
-            log_event("INFO", "engine reset")
+        if self.state.snapshot.status != EngineStatus.ERROR:
+            return False, "reset only allowed in ERROR"
+        self.state.publish(replace(self.state.snapshot, status=EngineStatus.IDLE, last_error=None))
+        log_event("INFO", "engine reset")
         return True, "reset"
 
-    def _run_loop(self) -> None:
+    async def _run_loop(self) -> None:
+        stop_event = self.state.stop_event
         try:
-            while not self.state.stop_event.is_set():
-                _ = self.client.get_ticker_trade_price(self.settings.trading_market)
+            while not stop_event.is_set():
+                # Never keep trading once order/event history has failed to reach the database.
+                write_error = take_write_error()
+                if write_error is not None:
+                    raise RuntimeError(f"database write failed: {write_error}")
+                self.prices.push(await self.client.get_ticker_trade_price(self.settings.trading_market))
                 signal = generate_signal()
+                now = utc_now_iso()  # one clock read per tick, shared by every row it writes
                 if signal in {"BUY", "SELL"}:
                     insert_order(
                         market=self.settings.trading_market,
@@ -61,19 +90,28 @@ class EngineController:
                         amount_krw=self.settings.max_order_krw,
                         mode="PAPER" if self.settings.paper_mode else "LIVE",
                         status="FILLED" if self.settings.paper_mode else "REQUESTED",
+                        ts=now,
                     )
-                    log_event("INFO", f"{signal} signal executed")
+                    log_event("INFO", f"{signal} signal executed", ts=now)
                 else:
-                    log_event("DEBUG", "HOLD signal")
-                with self.state.lock:
-                    self.state.cycle_count += 1
-                time.sleep(self.settings.loop_interval_sec)
+                    log_event("DEBUG", "HOLD signal", ts=now)
+                snap = self.state.snapshot
+                self.state.publish(replace(snap, cycle_count=snap.cycle_count + 1))
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.settings.loop_interval_sec)
+                except TimeoutError:
+                    pass
 
-            with self.state.lock:
-                self.state.status = EngineStatus.IDLE
+            self.state.publish(replace(self.state.snapshot, status=EngineStatus.IDLE))
             log_event("INFO", "engine stopped")
+        except asyncio.CancelledError:
+            self.state.publish(replace(self.state.snapshot, status=EngineStatus.IDLE))
+            log_event("WARNING", "engine cancelled during shutdown")
+            raise
         except Exception as exc:  # noqa: BLE001
-            with self.state.lock:
-                self.state.status = EngineStatus.ERROR
-                self.state.last_error = str(exc)
+            self.state.publish(
+                replace(self.state.snapshot, status=EngineStatus.ERROR, last_error=str(exc))
+            )
             log_event("ERROR", f"engine crashed: {exc}")
+        finally:
+            await asyncio.to_thread(flush_writes)
@@ -1,10 +1,28 @@
-from random import random
+from array import array
+from random import getrandbits
+
+# 256-slot lookup indexed by one random byte: ~20% BUY, ~20% SELL, ~60% HOLD.
+_SIGNALS = ("BUY",) * 51 + ("SELL",) * 51 + ("HOLD",) * 154
+
+
+class PriceHistory:
+    """Fixed-capacity ring of recent trade prices; the float64 buffer is allocated once."""
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._buf = array("d", bytes(8 * capacity))
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def push(self, price: float) -> None:
+        self._buf[self._count % self.capacity] = price
+        self._count += 1
+
+    def clear(self) -> None:
+        self._count = 0
 
 
 def generate_signal() -> str:
-    r = random()
-    if r < 0.2:
-        return "BUY"
-    if r < 0.4:
-        return "SELL"
-    return "HOLD"
+    return _SIGNALS[getrandbits(8)]
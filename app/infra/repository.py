@@ -1,80 +1,195 @@
+import logging
+import secrets
 import sqlite3
-from pathlib import Path
+from collections import deque
 from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from threading import Event, Lock, Thread
+
+import aiosqlite
 
 DB_PATH = Path("data/autocoin.db")
 
+WRITE_FLUSH_INTERVAL_SEC = 0.5
+RECENT_EVENTS_MAXLEN = 500
+
+logger = logging.getLogger(__name__)
 
-def _connect() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+# Pending (sql, params) writes; the writer commits them all in one transaction per flush.
+_pending_writes: deque[tuple[str, tuple]] = deque()
+_flush_lock = Lock()
+_writer_stop = Event()
+_write_error: str | None = None  # set when a flush fails; the engine picks it up via take_write_error()
+_writer_conn: sqlite3.Connection | None = None
+_writer_thread: Thread | None = None
+# Newest events kept as ready-to-serve dicts so /api/logs/recent never hits SQLite.
+_recent_events: deque[dict] = deque(maxlen=RECENT_EVENTS_MAXLEN)
+_recent_events_lock = Lock()
+_recent_events_version = 0  # bumped on every change to _recent_events; backs the logs ETag
+# Regenerated whenever init_db() opens the database, so versions from an earlier process never match.
+_recent_events_epoch = secrets.token_hex(4)
 
 
 def init_db() -> None:
-    conn = _connect()
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS engine_events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts TEXT NOT NULL,
-            level TEXT NOT NULL,
-            message TEXT NOT NULL
+    global _writer_conn, _writer_thread, _recent_events_version, _recent_events_epoch
+    if _writer_conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _writer_conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        _writer_conn.execute("PRAGMA journal_mode=WAL")
+        _writer_conn.execute("PRAGMA synchronous=NORMAL")
+        _writer_conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS engine_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                level TEXT NOT NULL,
+                message TEXT NOT NULL
+            )
+            """
         )
-        """
-    )
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS orders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts TEXT NOT NULL,
-            market TEXT NOT NULL,
-            side TEXT NOT NULL,
-            amount_krw REAL NOT NULL,
-            mode TEXT NOT NULL,
-            status TEXT NOT NULL
+        _writer_conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS orders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                market TEXT NOT NULL,
+                side TEXT NOT NULL,
+                amount_krw REAL NOT NULL,
+                mode TEXT NOT NULL,
+                status TEXT NOT NULL
+            )
+            """
         )
-        """
-    )
-    conn.commit()
-    conn.close()
+        rows = _writer_conn.execute(
+            "SELECT ts, level, message FROM engine_events ORDER BY id DESC LIMIT ?",
+            (RECENT_EVENTS_MAXLEN,),
+        ).fetchall()
+        with _recent_events_lock:
+            _recent_events.extendleft(
+                {"ts": ts, "level": level, "message": message} for ts, level, message in rows
+            )
+            _recent_events_version += 1
+            _recent_events_epoch = secrets.token_hex(4)
+    if _writer_thread is None or not _writer_thread.is_alive():
+        _writer_thread = Thread(target=_drain_writes, daemon=True)
+        _writer_thread.start()
 
 
-def log_event(level: str, message: str) -> None:
-    conn = _connect()
-    conn.execute(
-        "INSERT INTO engine_events(ts, level, message) VALUES (?, ?, ?)",
-        (datetime.now(timezone.utc).isoformat(), level, message),
-    )
-    conn.commit()
-    conn.close()
+def _drain_writes() -> None:
+    while not _writer_stop.wait(WRITE_FLUSH_INTERVAL_SEC):
+        flush_writes()
+    flush_writes()
+
+
+def flush_writes() -> None:
+    """Commit every pending write now, in a single transaction."""
+    global _write_error
+    if _writer_conn is None:
+        return
+    with _flush_lock:
+        batch = []
+        while _pending_writes:
+            batch.append(_pending_writes.popleft())
+        if not batch:
+            return
+        try:
+            _write_batch(batch)
+        except sqlite3.Error:
+            logger.exception("batched flush of %d writes failed; retrying them one by one", len(batch))
+            dropped, last_exc = _write_each(batch)
+            if dropped:
+                _write_error = f"{dropped} of {len(batch)} pending writes dropped: {last_exc}"
+
+
+def _write_each(batch: list[tuple[str, tuple]]) -> tuple[int, sqlite3.Error | None]:
+    """Commit each write on its own so a bad row only loses itself; returns (dropped, last error)."""
+    dropped, last_exc = 0, None
+    for sql, params in batch:
+        try:
+            _writer_conn.execute(sql, params)
+        except sqlite3.Error as exc:
+            logger.error("dropped write %r %r: %s", sql, params, exc)
+            dropped, last_exc = dropped + 1, exc
+    return dropped, last_exc
+
+
+def take_write_error() -> str | None:
+    """Return and clear the last flush failure, or None if every flush succeeded."""
+    global _write_error
+    error, _write_error = _write_error, None
+    return error
+
 
+def _write_batch(batch: list[tuple[str, tuple]]) -> None:
+    grouped: dict[str, list[tuple]] = {}
+    for sql, params in batch:
+        grouped.setdefault(sql, []).append(params)
+    _writer_conn.execute("BEGIN")
+    try:
+        for sql, rows in grouped.items():
+            _writer_conn.executemany(sql, rows)
+    except Exception:
+        _writer_conn.execute("ROLLBACK")
+        raise
+    _writer_conn.execute("COMMIT")
 
-def insert_order(market: str, side: str, amount_krw: float, mode: str, status: str) -> None:
-    conn = _connect()
-    conn.execute(
-        "INSERT INTO orders(ts, market, side, amount_krw, mode, status) VALUES (?, ?, ?, ?, ?, ?)",
-        (datetime.now(timezone.utc).isoformat(), market, side, amount_krw, mode, status),
+
+def flush_on_shutdown() -> None:
+    """Write out everything queued so far and stop the writer thread."""
+    global _writer_thread
+    if _writer_thread is None or not _writer_thread.is_alive():
+        return
+    _writer_stop.set()
+    _writer_thread.join()
+    _writer_thread = None
+    _writer_stop.clear()
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def log_event(level: str, message: str, ts: str | None = None) -> None:
+    global _recent_events_version
+    ts = ts or utc_now_iso()
+    with _recent_events_lock:
+        _recent_events.append({"ts": ts, "level": level, "message": message})
+        _recent_events_version += 1
+    _pending_writes.append(("INSERT INTO engine_events(ts, level, message) VALUES (?, ?, ?)", (ts, level, message)))
+
+
+def insert_order(
+    market: str, side: str, amount_krw: float, mode: str, status: str, ts: str | None = None
+) -> None:
+    _pending_writes.append(
+        (
+            "INSERT INTO orders(ts, market, side, amount_krw, mode, status) VALUES (?, ?, ?, ?, ?, ?)",
+            (ts or utc_now_iso(), market, side, amount_krw, mode, status),
+        )
     )
-    conn.commit()
-    conn.close()
 
 
-def recent_events(limit: int = 50) -> list[dict]:
-    conn = _connect()
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT ts, level, message FROM engine_events ORDER BY id DESC LIMIT ?", (limit,)
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+async def open_reader() -> aiosqlite.Connection:
+    """Open the shared read-only connection used by the API; call after init_db()."""
+    conn = await aiosqlite.connect(f"file:{DB_PATH.as_posix()}?mode=ro&cache=shared", uri=True)
+    conn.row_factory = aiosqlite.Row
+    return conn
+
 
+def recent_events(limit: int = 50) -> tuple[str, list[dict]]:
+    """Return ``(version, events)``, newest first.
 
-def recent_orders(limit: int = 20) -> list[dict]:
-    conn = _connect()
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
+    The version changes whenever the events do and is unique to this process's database session.
+    """
+    with _recent_events_lock:
+        version = f"{_recent_events_epoch}-{_recent_events_version}"
+        return version, list(islice(reversed(_recent_events), limit))
+
+
+async def recent_orders(db: aiosqlite.Connection, limit: int = 20) -> list[dict]:
+    rows = await db.execute_fetchall(
         "SELECT ts, market, side, amount_krw, mode, status FROM orders ORDER BY id DESC LIMIT ?",
         (limit,),
-    ).fetchall()
-    conn.close()
+    )
     return [dict(r) for r in rows]
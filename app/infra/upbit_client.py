@@ -1,11 +1,30 @@
-import requests
+import httpx
 
 
 class UpbitClient:
     BASE_URL = "https://api.upbit.com/v1"
 
-    def get_ticker_trade_price(self, market: str) -> float:
-        resp = requests.get(f"{self.BASE_URL}/ticker", params={"markets": market}, timeout=5)
+    def __init__(self) -> None:
+        self._http: httpx.AsyncClient | None = None
+
+    def _client(self) -> httpx.AsyncClient:
+        # Built lazily on the running loop and dropped by aclose(), so pooled keep-alive
+        # connections never outlive the event loop they were opened on.
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=4),
+            )
+        return self._http
+
+    async def get_ticker_trade_price(self, market: str) -> float:
+        resp = await self._client().get("/ticker", params={"markets": market})
         resp.raise_for_status()
         data = resp.json()
         return float(data[0]["trade_price"])
+
+    async def aclose(self) -> None:
+        http, self._http = self._http, None
+        if http is not None:
+            await http.aclose()
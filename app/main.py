@@ -1,33 +1,56 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+import asyncio
+from pathlib import Path
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from app.api.routes import build_router
-from app.core.config import load_settings
+from app.core.config import Settings, load_settings
 from app.core.state import EngineState
 from app.engine.controller import EngineController
-from app.infra.repository import init_db
+from app.infra.repository import flush_on_shutdown, init_db, open_reader
 
 settings = load_settings()
 state = EngineState()
 controller = EngineController(state=state, settings=settings)
 
-app = FastAPI(title="autocoin dashboard")
+app = FastAPI(title="autocoin dashboard", default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=1)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
-templates = Jinja2Templates(directory="app/templates")
+TEMPLATE_CACHE_DIR = Path(".jinja_cache")
+templates = Environment(
+    loader=FileSystemLoader("app/templates"),
+    autoescape=True,
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache(str(TEMPLATE_CACHE_DIR)),
+)
 app.include_router(build_router(state, controller))
 
 
 @app.on_event("startup")
-def on_startup() -> None:
+async def on_startup() -> None:
     init_db()
+    app.state.db = await open_reader()
+    TEMPLATE_CACHE_DIR.mkdir(exist_ok=True)
+    app.state.dashboard_tmpl = templates.get_template("dashboard.html")
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    controller.stop()
+    await controller.wait_stopped()
+    await controller.client.aclose()
+    await app.state.db.close()
+    await asyncio.to_thread(flush_on_shutdown)
 
 
 @app.get("/", response_class=HTMLResponse)
-def dashboard(request: Request):
-    return templates.TemplateResponse(
-        request,
-        "dashboard.html",
-        {"market": settings.trading_market, "paper_mode": settings.paper_mode},
+def dashboard(request: Request, settings: Settings = Depends(load_settings)):
+    return HTMLResponse(
+        request.app.state.dashboard_tmpl.render(
+            request=request, market=settings.trading_market, paper_mode=settings.paper_mode
+        )
     )
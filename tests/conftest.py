@@ -1,4 +1,24 @@
 import sys
+from collections import deque
 from pathlib import Path
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """Point the repository (writer, reader and recent-events ring) at a fresh database."""
+    from app.infra import repository
+
+    repository.flush_on_shutdown()  # stop any writer still bound to the previous database
+    monkeypatch.setattr(repository, "DB_PATH", tmp_path / "autocoin.db")
+    monkeypatch.setattr(repository, "_writer_conn", None)
+    monkeypatch.setattr(repository, "_write_error", None)
+    monkeypatch.setattr(repository, "_pending_writes", deque())
+    monkeypatch.setattr(repository, "_recent_events", deque(maxlen=repository.RECENT_EVENTS_MAXLEN))
+    repository.init_db()
+    yield repository.DB_PATH
+    repository.flush_on_shutdown()
+    repository._writer_conn.close()
@@ -1,11 +1,18 @@
+import sqlite3
 import time
 from fastapi.testclient import TestClient
 
+from app.api.routes import CACHE_TTL_SEC
+from app.infra import repository
+from app.infra.repository import flush_writes, insert_order
 from app.main import app, controller
 
 
 def test_start_and_stop(monkeypatch):
-    monkeypatch.setattr(controller.client, "get_ticker_trade_price", lambda market: 100.0)
+    async def fake_price(market):
+        return 100.0
+
+    monkeypatch.setattr(controller.client, "get_ticker_trade_price", fake_price)
     with TestClient(app) as client:
         start = client.post('/api/engine/start').json()
         assert start['ok'] is True
@@ -15,8 +22,65 @@ def test_start_and_stop(monkeypatch):
         status = client.get('/api/engine/status').json()
         assert status['data']['status'] in {'RUNNING', 'STOPPING', 'IDLE'}
 
-        stop = client.post('/api/engine/stop').json()
-        assert stop['ok'] is True
+        stop = client.post('/api/engine/stop')
+        assert stop.status_code == 202
+        assert stop.json()['ok'] is True
+        assert stop.json()['data']['status'] == 'STOPPING'
+
+        deadline = time.monotonic() + 2
+        status = client.get('/api/engine/status').json()
+        while status['data']['status'] != 'IDLE' and time.monotonic() < deadline:
+            time.sleep(0.05)
+            status = client.get('/api/engine/status').json()
+        assert status['data']['status'] == 'IDLE'
+
+
+def test_stopped_engine_flushes_its_log(tmp_db, monkeypatch):
+    async def fake_price(market):
+        return 100.0
+
+    monkeypatch.setattr(controller.client, "get_ticker_trade_price", fake_price)
+    with TestClient(app) as client:
+        client.post('/api/engine/start')
+        client.post('/api/engine/stop')
+
+        deadline = time.monotonic() + 2
+        rows = []
+        while not rows and time.monotonic() < deadline:
+            conn = sqlite3.connect(tmp_db)
+            rows = conn.execute("SELECT 1 FROM engine_events WHERE message = 'engine stopped'").fetchall()
+            conn.close()
+            time.sleep(0.05)
+        assert rows
+
+
+def test_recent_orders_reads_committed_rows(tmp_db):
+    with TestClient(app) as client:
+        insert_order(market='KRW-BTC', side='SELL', amount_krw=5000, mode='PAPER', status='FILLED')
+        flush_writes()
+
+        res = client.get('/api/orders/recent')
+        assert res.status_code == 200
+        orders = res.json()['data']['orders']
+        assert [(o['market'], o['side'], o['amount_krw']) for o in orders] == [('KRW-BTC', 'SELL', 5000.0)]
+
+
+def test_start_does_not_inherit_an_idle_write_failure(tmp_db, monkeypatch):
+    async def fake_price(market):
+        return 100.0
+
+    monkeypatch.setattr(controller.client, "get_ticker_trade_price", fake_price)
+    repository._pending_writes.append(("INSERT INTO missing_table VALUES (?)", (1,)))
+    flush_writes()
+    with TestClient(app) as client:
+        client.post('/api/engine/start')
+        time.sleep(0.1)
+        status = client.get('/api/engine/status').json()['data']
+        assert status['status'] == 'RUNNING'
+        assert status['last_error'] is None
+        logs = client.get('/api/logs/recent').json()['data']['logs']
+        assert any('database write failed before this run' in log['message'] for log in logs)
+        client.post('/api/engine/stop')
 
 
 def test_dashboard_page():
@@ -24,3 +88,46 @@ def test_dashboard_page():
         res = client.get('/')
         assert res.status_code == 200
         assert 'Autocoin Dashboard' in res.text
+
+
+def test_status_revalidates_with_etag():
+    with TestClient(app) as client:
+        first = client.get('/api/engine/status')
+        assert first.headers['cache-control'] == 'max-age=1'
+        again = client.get('/api/engine/status', headers={'If-None-Match': first.headers['etag']})
+        assert again.status_code == 304
+
+
+def test_logs_revalidate_with_etag():
+    with TestClient(app) as client:
+        first = client.get('/api/logs/recent')
+        etag = first.headers['etag']
+        again = client.get('/api/logs/recent', headers={'If-None-Match': etag})
+        assert again.status_code == 304
+
+
+def test_etag_list_and_wildcard_revalidate():
+    with TestClient(app) as client:
+        etag = client.get('/api/engine/status').headers['etag']
+        strong = etag.removeprefix('W/')
+        for header in (f'W/"other", {etag}', f'"other",{strong}', '*'):
+            res = client.get('/api/engine/status', headers={'If-None-Match': header})
+            assert res.status_code == 304
+        assert client.get('/api/engine/status', headers={'If-None-Match': 'W/"other"'}).status_code == 200
+
+
+def test_logs_etag_does_not_survive_restart(tmp_db, monkeypatch):
+    with TestClient(app) as client:
+        etag = client.get('/api/logs/recent').headers['etag']
+
+        # Simulate a fresh process: new connection and the version counter back at zero.
+        repository._writer_conn.close()
+        monkeypatch.setattr(repository, '_writer_conn', None)
+        monkeypatch.setattr(repository, '_recent_events_version', 0)
+        repository._recent_events.clear()
+        repository.init_db()
+        time.sleep(CACHE_TTL_SEC + 0.1)
+
+        res = client.get('/api/logs/recent', headers={'If-None-Match': etag})
+        assert res.status_code == 200
+        assert res.headers['etag'] != etag
@@ -0,0 +1,38 @@
+import sqlite3
+
+from app.infra import repository
+
+
+def test_buffered_writes_reach_sqlite(tmp_db):
+    repository.log_event("INFO", "hello", ts="2026-01-01T00:00:00+00:00")
+    repository.insert_order(
+        market="KRW-BTC",
+        side="BUY",
+        amount_krw=10000,
+        mode="PAPER",
+        status="FILLED",
+        ts="2026-01-01T00:00:00+00:00",
+    )
+    repository.flush_writes()
+
+    conn = sqlite3.connect(tmp_db)
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert conn.execute("SELECT level, message FROM engine_events").fetchall() == [("INFO", "hello")]
+    assert conn.execute("SELECT market, side, amount_krw, mode, status FROM orders").fetchall() == [
+        ("KRW-BTC", "BUY", 10000.0, "PAPER", "FILLED")
+    ]
+    conn.close()
+    assert repository.take_write_error() is None
+
+
+def test_failed_flush_only_drops_the_bad_rows(tmp_db):
+    repository.log_event("INFO", "before")
+    repository._pending_writes.append(("INSERT INTO missing_table VALUES (?)", (1,)))
+    repository.log_event("INFO", "after")
+    repository.flush_writes()
+
+    assert "1 of 3 pending writes dropped" in repository.take_write_error()
+    assert repository.take_write_error() is None
+    conn = sqlite3.connect(tmp_db)
+    assert conn.execute("SELECT message FROM engine_events ORDER BY id").fetchall() == [("before",), ("after",)]
+    conn.close()
@@ -0,0 +1,18 @@
+from app.engine.strategy import PriceHistory, generate_signal
+
+
+def test_price_history_wraps_around_and_clears():
+    prices = PriceHistory(capacity=4)
+    assert len(prices) == 0
+
+    for price in [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]:
+        prices.push(price)
+    assert len(prices) == 4
+    assert list(prices._buf) == [5.0, 6.0, 3.0, 4.0]
+
+    prices.clear()
+    assert len(prices) == 0
+
+
+def test_generate_signal_values():
+    assert {generate_signal() for _ in range(2000)} == {"BUY", "SELL", "HOLD"}